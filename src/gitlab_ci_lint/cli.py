@@ -1,11 +1,95 @@
 import json
+import os
 
 import click
-from rich.console import Console
 
-from .linter import GitLabCILinter
 
-console = Console()
+def _json_dumps(obj) -> bytes:
+    """Serialize like orjson: two-space indent, non-ASCII text as raw UTF-8."""
+    text = json.dumps(obj, indent=2, ensure_ascii=False)
+    try:
+        return text.encode()
+    except UnicodeEncodeError:
+        # Lone surrogates (undecodable file names) cannot be UTF-8; escape them
+        return json.dumps(obj, indent=2).encode()
+
+
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:  # orjson rejects strings that are not valid UTF-8
+            return _json_dumps(obj)
+
+except ImportError:  # orjson is an optional speedup (the "fast" extra)
+    _dumps = _json_dumps
+
+
+# rich, the linter (jsonschema, yaml, the bundled schema) and the process pool
+# are imported on first use, so `--help` and usage errors only pay for click.
+_console = None
+_linter = None
+
+
+def _get_console():
+    """Return the process-wide rich console, creating it on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+def _get_linter():
+    """Return the process-wide linter, creating it on first use."""
+    global _linter
+    if _linter is None:
+        from .linter import GitLabCILinter
+
+        _linter = GitLabCILinter()
+    return _linter
+
+
+def _lint_one(file_path):
+    """Lint a single file; runs inside pool workers."""
+    return _get_linter().lint_file(file_path)
+
+
+def _iter_results(files, jobs):
+    """Yield ``(file_path, errors)`` in argument order, using a process pool if jobs > 1."""
+    if jobs == 1:
+        for file_path in files:
+            yield file_path, _lint_one(file_path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        yield from zip(files, executor.map(_lint_one, files), strict=True)
+    finally:
+        # Drop queued work if the caller stopped early (--fail-fast)
+        executor.shutdown(cancel_futures=True)
+
+
+def _emit_text(file_path, errors):
+    if not errors:
+        # Plain click output: the success line needs no rich markup or layout
+        click.secho(f"✓ {file_path} is valid", fg="green")
+    else:
+        console = _get_console()
+        console.print(f"[red]✗ {file_path} has {len(errors)} errors:[/red]")
+        for err in errors:
+            console.print(f"  - {err}")
+        console.print("")  # spacing
+
+
+def _json_entry(file_path, errors):
+    """Format one result as it appears in the indented JSON object of all results."""
+    return b"  " + _dumps(file_path) + b": " + _dumps(errors).replace(b"\n", b"\n  ")
 
 
 @click.command()
@@ -16,29 +100,45 @@ console = Console()
     default="text",
     help="Output format",
 )
-def cli(files, format):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of worker processes (default: CPU count when linting more than 4 files)",
+)
+@click.option(
+    "--fail-fast",
+    is_flag=True,
+    default=False,
+    help="Stop after the first file with errors",
+)
+def cli(files, format, jobs, fail_fast):
     """Validate GitLab CI/CD configuration files."""
-    linter = GitLabCILinter()
-    has_errors = False
-    results = {}
+    # Results are keyed by path, so each file only needs linting once
+    files = tuple(dict.fromkeys(files))
+    if jobs is None:
+        jobs = (os.cpu_count() or 1) if len(files) > 4 else 1
+    jobs = min(jobs, len(files))
+
+    # Build the linter up front so forked workers inherit the compiled schema
+    _get_linter()
 
-    for file_path in files:
-        errors = linter.lint_file(file_path)
-        results[file_path] = errors
+    # Results are printed as they arrive instead of after the whole batch
+    has_errors = False
+    if format == "json":
+        click.echo(b"{", nl=False)
+    for i, (file_path, errors) in enumerate(_iter_results(files, jobs)):
+        if format == "json":
+            click.echo((b"\n" if i == 0 else b",\n") + _json_entry(file_path, errors), nl=False)
+        else:
+            _emit_text(file_path, errors)
         if errors:
             has_errors = True
-
+            if fail_fast:
+                break
     if format == "json":
-        click.echo(json.dumps(results, indent=2))
-    else:
-        for file_path, errors in results.items():
-            if not errors:
-                console.print(f"[green]✓ {file_path} is valid[/green]")
-            else:
-                console.print(f"[red]✗ {file_path} has {len(errors)} errors:[/red]")
-                for err in errors:
-                    console.print(f"  - {err}")
-                console.print("")  # spacing
+        click.echo(b"\n}")
 
     if has_errors:
         raise click.Abort()
@@ -1,55 +1,229 @@
+import functools
+import hashlib
+import logging
+import os
+from typing import Any
+
+import fastjsonschema
 import jsonschema
 import yaml
 
-from .schema import load_schema
-from .semantic import check_circular_extends, check_extends, check_needs, check_stages
+from .schema import load_compiled_validator, load_schema, load_validator
+from .semantic import lint_all
+
+logger = logging.getLogger(__name__)
+
+# Chosen once at import: libyaml's C loader when PyYAML was built with it
+if yaml.__with_libyaml__:
+    from yaml import CSafeLoader as _SafeLoader
+else:
+    from yaml import SafeLoader as _SafeLoader
+
+    logger.warning(
+        "PyYAML was built without libyaml; using the much slower pure-Python YAML loader"
+    )
+
+# Files at least this large get a quick look at their first YAML events before
+# the full parse, so a top level that is not a mapping skips construction.
+_HEADER_SCAN_MIN_BYTES = 64 * 1024
+
+_NOT_A_MAPPING = "Invalid configuration: File is empty or not a dictionary"
+
+# O_BINARY only exists (and matters) on Windows
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+
+def _read_bytes(path: str) -> bytes:
+    """Read a whole file with raw os-level reads, sized from fstat."""
+    fd = os.open(path, _OPEN_FLAGS)
+    try:
+        # st_size is 0 for pseudo-files, so fall back to a fixed chunk size
+        chunk_size = os.fstat(fd).st_size or 64 * 1024
+        chunks = []
+        while chunk := os.read(fd, chunk_size):
+            chunks.append(chunk)
+        return b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+def _top_level_is_mapping(content) -> bool:
+    """Check whether the first YAML document starts with a mapping.
+
+    Only the leading parser events are read. Syntax errors count as a mapping
+    so that the full parse gets to report them.
+    """
+    try:
+        for event in yaml.parse(content, Loader=_SafeLoader):
+            if isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+                continue
+            return isinstance(event, yaml.MappingStartEvent)
+    except yaml.YAMLError:
+        return True
+    # Stream ended without a document
+    return False
+
+
+_TAG = "tag:yaml.org,2002:"
+# Scalars with these tags always construct; int, float and bool scalars are
+# constructed to check them, since explicit tags ('!!int abc') and some
+# resolver matches ('0b_') fail.
+_SAFE_SCALAR_TAGS = frozenset((_TAG + "str", _TAG + "null"))
+_CHECKED_SCALAR_TAGS = frozenset((_TAG + "int", _TAG + "float", _TAG + "bool"))
+_constructor = yaml.constructor.SafeConstructor()
+
+
+def _constructs_cleanly(node: yaml.Node) -> bool:
+    """Check whether loading a composed node tree is certain to succeed.
+
+    Any other tag (timestamps, merge keys, GitLab's ``!reference``, ...) or a
+    collection used as a mapping key counts as a possible failure.
+    """
+    stack = [node]
+    seen = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue  # Aliases share nodes and may form cycles
+        seen.add(id(node))
+        tag = node.tag
+        if isinstance(node, yaml.ScalarNode):
+            if tag in _SAFE_SCALAR_TAGS:
+                continue
+            if tag not in _CHECKED_SCALAR_TAGS:
+                return False
+            try:
+                _constructor.yaml_constructors[tag](_constructor, node)
+            except Exception:
+                return False
+        elif isinstance(node, yaml.SequenceNode) and tag == _TAG + "seq":
+            stack.extend(node.value)
+        elif isinstance(node, yaml.MappingNode) and tag == _TAG + "map":
+            for key, value in node.value:
+                if not isinstance(key, yaml.ScalarNode):
+                    return False
+                stack.append(key)
+                stack.append(value)
+        else:
+            return False
+    return True
+
+
+def _is_non_mapping(content) -> bool:
+    """Check whether content is certain to load cleanly as something other than a mapping.
+
+    Cheap for the common case: a mapping is recognized from its first events.
+    Otherwise the document is composed but not constructed. Anything that the
+    full load could still reject (syntax errors, several documents, tags that
+    fail to construct) returns False, so the full load reports it.
+    """
+    if _top_level_is_mapping(content):
+        return False
+    try:
+        node = yaml.compose(content, Loader=_SafeLoader)
+    except yaml.YAMLError:
+        return False
+    return node is None or (not isinstance(node, yaml.MappingNode) and _constructs_cleanly(node))
+
+
+@functools.lru_cache(maxsize=128)
+def _parse_yaml(content: str | bytes) -> Any:
+    """Parse YAML content, memoized on the exact string or bytes.
+
+    The key is the content itself, not its meaning: text that differs only in
+    whitespace or comments is parsed again. The cache is shared by every
+    linter in the process; callers share the returned object and must not
+    modify it.
+    """
+    return yaml.load(content, Loader=_SafeLoader)
+
+
+def _format_yaml_error(e: yaml.YAMLError) -> str:
+    """Render a YAML syntax error as a lint message."""
+    return f"YAML parsing error: {str(e)}"
+
+
+def _format_schema_error(e: jsonschema.ValidationError) -> str:
+    """Render a schema error with a dotted path to the offending value."""
+    if e.path:
+        return f"Schema error at '{'.'.join(map(str, e.path))}': {e.message}"
+    return f"Schema error: {e.message}"
 
 
 class GitLabCILinter:
     def __init__(self):
         self.schema = load_schema()
+        self._validator = load_validator()
+        self._validate = load_compiled_validator()
+        # lint_file results keyed by a digest of the file contents
+        self._cache: dict[bytes, list[str]] = {}
 
-    def lint(self, content: str) -> list[str]:
-        """Lint the provided YAML content and return a list of error messages."""
-        errors = []
+    def lint(self, content: str | bytes) -> list[str]:
+        """Lint the provided YAML content and return a list of error messages.
 
+        ``content`` may be text or raw bytes; bytes are decoded by the YAML
+        reader, which also detects UTF-16/32 byte-order marks.
+        """
         # 1. YAML Parsing
         try:
-            config = yaml.safe_load(content)
+            config = _parse_yaml(content)
         except yaml.YAMLError as e:
-            return [f"YAML parsing error: {str(e)}"]
+            return [_format_yaml_error(e)]
+
+        return self.lint_parsed(config)
+
+    def clear_cache(self) -> None:
+        """Forget this linter's lint_file results and all memoized YAML parses.
+
+        The parse cache behind lint() is process-wide, so this also clears it
+        for every other linter instance.
+        """
+        _parse_yaml.cache_clear()
+        self._cache.clear()
+
+    def lint_parsed(self, config: Any) -> list[str]:
+        """Lint an already-parsed configuration and return a list of error messages."""
+        errors = []
 
         if not config or not isinstance(config, dict):
             # empty file or valid yaml but not a dict
-            return ["Invalid configuration: File is empty or not a dictionary"]
+            return [_NOT_A_MAPPING]
 
         # 2. Schema Validation
+        # The compiled validator is a fast yes/no check; only invalid configs pay
+        # for jsonschema, which gives the richer error message and path.
         try:
-            jsonschema.validate(instance=config, schema=self.schema)
-        except jsonschema.ValidationError as e:
-            # Create a more readable error path
-            path = ".".join(str(p) for p in e.path)
-            error_msg = (
-                f"Schema error at '{path}': {e.message}" if path else f"Schema error: {e.message}"
-            )
-            errors.append(error_msg)
+            self._validate(config)
+        except fastjsonschema.JsonSchemaException:
+            errors.extend(_format_schema_error(e) for e in self._validator.iter_errors(config))
             # We continue to find semantic errors if possible, but often schema errors make structure invalid
 
         # 3. Semantic Checks
         # Only run if basic structure is presumably okay (parsed as dict)
         if isinstance(config, dict):
-            errors.extend(check_needs(config))
-            errors.extend(check_stages(config))
-            errors.extend(check_extends(config))
-            errors.extend(check_circular_extends(config))
+            errors.extend(lint_all(config))
 
         return errors
 
     def lint_file(self, path: str) -> list[str]:
         """Lint a file from disk."""
         try:
-            with open(path, encoding="utf-8") as f:
-                content = f.read()
-            return self.lint(content)
+            raw = _read_bytes(path)
+            key = hashlib.blake2b(raw, digest_size=16).digest()
+            if key in self._cache:
+                return list(self._cache[key])
+            if len(raw) >= _HEADER_SCAN_MIN_BYTES and _is_non_mapping(raw):
+                errors = [_NOT_A_MAPPING]
+            else:
+                # Parsed directly: lint_file results are cached by digest above,
+                # so keeping whole files in the lint() parse cache buys nothing
+                try:
+                    config = yaml.load(raw, Loader=_SafeLoader)
+                except yaml.YAMLError as e:
+                    errors = [_format_yaml_error(e)]
+                else:
+                    errors = self.lint_parsed(config)
         except Exception as e:
             return [f"Could not read file '{path}': {str(e)}"]
+        self._cache[key] = errors
+        return list(errors)
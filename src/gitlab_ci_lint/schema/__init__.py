@@ -1,14 +1,186 @@
+import contextlib
+import importlib.util
 import json
 import os
+import pickle
 from functools import lru_cache
+from typing import Any, cast
 
+import fastjsonschema
+from jsonschema.validators import validator_for
+
+from . import optimize
+
+_SCHEMA_DIR = os.path.dirname(__file__)
+_SCHEMA_PATH = os.path.join(_SCHEMA_DIR, "ci.json")
+# Derived from ci.json (canonicalized by optimize.py, compiled with the
+# options in this module) and rebuilt whenever any source is newer; see
+# _is_fresh()
+_CACHE_SOURCES = (_SCHEMA_PATH, optimize.__file__, __file__)
+_PICKLE_PATH = _SCHEMA_PATH + ".pkl"
+_VALIDATOR_PATH = os.path.join(_SCHEMA_DIR, "_ci_validator.py")
+
+
+def _readonly(_self, *_args, **_kwargs):
+    raise TypeError("The bundled schema is read-only")
+
+
+class _FrozenDict(dict):
+    """A dict that rejects mutation.
+
+    It stays a real ``dict`` because jsonschema and fastjsonschema type-check
+    schema nodes with ``isinstance(..., dict)``.
+    """
+
+    # One stub stands in for methods with different signatures
+    __setitem__ = __delitem__ = __ior__ = _readonly  # pyright: ignore[reportAssignmentType]
+    clear = pop = popitem = setdefault = update = _readonly  # pyright: ignore[reportAssignmentType]
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class _FrozenList(list):
+    """A list that rejects mutation; see ``_FrozenDict``."""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly  # pyright: ignore[reportAssignmentType]
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly  # pyright: ignore[reportAssignmentType]
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+def _freeze(node):
+    """Recursively convert parsed JSON into read-only containers."""
+    if isinstance(node, dict):
+        return _FrozenDict((key, _freeze(value)) for key, value in node.items())
+    if isinstance(node, list):
+        return _FrozenList(_freeze(item) for item in node)
+    return node
+
+
+def _thaw(node):
+    """Return a plain, mutable deep copy of a frozen schema node."""
+    if isinstance(node, dict):
+        return {key: _thaw(value) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_thaw(item) for item in node]
+    return node
+
+
+def _is_fresh(cache_path):
+    """Whether a cache file exists and is at least as new as its sources."""
+    try:
+        cache_mtime = os.path.getmtime(cache_path)
+        return all(cache_mtime >= os.path.getmtime(source) for source in _CACHE_SOURCES)
+    except OSError:
+        return False
+
+
+def _write_atomic(path, data: bytes):
+    """Write a cache file atomically; return False if it could not be written.
+
+    Failures are not errors: an installed package directory is often read-only,
+    in which case every run just rebuilds the cached value in memory.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        return False
+    return True
+
+
+def _load_raw_schema():
+    """Parse and canonicalize ci.json, going through the pickle cache when it is up to date."""
+    if _is_fresh(_PICKLE_PATH):
+        try:
+            with open(_PICKLE_PATH, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # Corrupt or unreadable cache: fall back to the JSON
 
-@lru_cache(maxsize=1)
-def load_schema():
-    """Load the bundled GitLab CI JSON schema."""
-    schema_path = os.path.join(os.path.dirname(__file__), "ci.json")
     try:
-        with open(schema_path, encoding="utf-8") as f:
-            return json.load(f)
+        with open(_SCHEMA_PATH, encoding="utf-8") as f:
+            schema = json.load(f)
     except FileNotFoundError as e:
-        raise RuntimeError(f"Bundled schema not found at {schema_path}") from e
+        raise RuntimeError(f"Bundled schema not found at {_SCHEMA_PATH}") from e
+    schema = optimize.intern_subschemas(schema)
+    _write_atomic(_PICKLE_PATH, pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL))
+    return schema
+
+
+@lru_cache(maxsize=1)
+def load_schema() -> dict[str, Any]:
+    """Load the bundled GitLab CI JSON schema.
+
+    The result is cached and shared by every linter, so it is returned
+    read-only: mutating it raises ``TypeError``.
+    """
+    return cast(dict[str, Any], _freeze(_load_raw_schema()))
+
+
+@lru_cache(maxsize=1)
+def load_validator():
+    """Build a jsonschema validator for the bundled schema.
+
+    The schema is checked against its meta-schema once per process and the
+    validator is shared by every linter. No format checker is attached, so it
+    agrees with the compiled validator (``use_formats=False``) on what is valid.
+    """
+    schema = load_schema()
+    validator_cls = validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+def _import_validator_module():
+    """Import the generated validator module, or return None if it is unusable."""
+    spec = importlib.util.spec_from_file_location(
+        "gitlab_ci_lint.schema._ci_validator", _VALIDATOR_PATH
+    )
+    if spec is None or spec.loader is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        return None
+    # Code generated by another fastjsonschema release may not match this one
+    if getattr(module, "VERSION", None) != fastjsonschema.VERSION:
+        return None
+    return module
+
+
+@lru_cache(maxsize=1)
+def load_compiled_validator():
+    """Compile the bundled schema into a fastjsonschema validation function.
+
+    The generated source is written next to ci.json and imported on later
+    runs, so Python's bytecode cache replaces the compile step.
+    """
+    if _is_fresh(_VALIDATOR_PATH):
+        module = _import_validator_module()
+        if module is not None:
+            return module.validate
+
+    # fastjsonschema rewrites '$ref' values in place while compiling, so it
+    # gets its own mutable copy of the frozen schema. Without the root '$id'
+    # the generated entry point is named plain `validate` (all refs are local).
+    schema = cast(dict[str, Any], _thaw(load_schema()))
+    schema.pop("$id", None)
+    # Mirror jsonschema.validate(): no format assertions, and never write
+    # schema defaults into the config being checked.
+    code = fastjsonschema.compile_to_code(schema, use_default=False, use_formats=False)
+    if _write_atomic(_VALIDATOR_PATH, code.encode("utf-8")):
+        module = _import_validator_module()
+        if module is not None:
+            return module.validate
+
+    namespace = {}
+    exec(compile(code, _VALIDATOR_PATH, "exec"), namespace)
+    return namespace["validate"]
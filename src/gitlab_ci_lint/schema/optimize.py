@@ -0,0 +1,102 @@
+"""Schema canonicalization applied once when the bundled schema is loaded."""
+
+import hashlib
+import json
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+# Keywords whose value is a single subschema
+_SCHEMA_KEYWORDS = frozenset(
+    {
+        "additionalItems",
+        "additionalProperties",
+        "contains",
+        "else",
+        "if",
+        "items",
+        "not",
+        "propertyNames",
+        "then",
+    }
+)
+# Keywords whose value is a list of subschemas
+_SCHEMA_LIST_KEYWORDS = frozenset({"allOf", "anyOf", "items", "oneOf"})
+# Keywords whose value maps names to subschemas
+_SCHEMA_MAP_KEYWORDS = frozenset({"definitions", "dependencies", "patternProperties", "properties"})
+
+# Sharing a subschema costs a $ref lookup (a function call in fastjsonschema),
+# so only subschemas at least this large (as canonical JSON) are interned.
+_MIN_INTERN_SIZE = 128
+
+_INTERNED_PREFIX = "_interned_"
+
+
+def _canonical(schema: dict[str, Any]) -> str:
+    return json.dumps(schema, sort_keys=True, separators=(",", ":"))
+
+
+def _map_subschemas(
+    node: dict[str, Any], fn: Callable[[dict[str, Any], bool], Any]
+) -> dict[str, Any]:
+    """Return a shallow copy of ``node`` with ``fn`` applied to each direct subschema.
+
+    ``fn`` also receives whether the subschema may be interned; named entries
+    under ``definitions`` may not.
+    """
+    result = {}
+    for keyword, value in node.items():
+        if keyword in _SCHEMA_KEYWORDS and isinstance(value, dict):
+            value = fn(value, True)
+        elif keyword in _SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            value = [fn(item, True) if isinstance(item, dict) else item for item in value]
+        elif keyword in _SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            # 'dependencies' values may also be lists of property names
+            internable = keyword != "definitions"
+            value = {
+                name: fn(item, internable) if isinstance(item, dict) else item
+                for name, item in value.items()
+            }
+        result[keyword] = value
+    return result
+
+
+def intern_subschemas(schema: dict[str, Any]) -> dict[str, Any]:
+    """Move repeated inline subschemas into shared definitions.
+
+    Every subschema that occurs more than once (by canonical JSON) and is
+    large enough to be worth sharing is stored once as
+    ``definitions/_interned_<hash>``, and each occurrence becomes a ``$ref``
+    to it. Named entries under ``definitions`` stay where they are. Returns
+    a new schema; ``schema`` is not modified.
+    """
+    counts: Counter[str] = Counter()
+
+    def count(node: dict[str, Any], internable: bool) -> dict[str, Any]:
+        if internable:
+            key = _canonical(node)
+            if len(key) >= _MIN_INTERN_SIZE:
+                counts[key] += 1
+        return _map_subschemas(node, count)
+
+    count(schema, False)
+    shared = {key for key, n in counts.items() if n > 1}
+    if not shared:
+        return schema
+
+    interned: dict[str, Any] = {}
+
+    def rewrite(node: dict[str, Any], internable: bool) -> dict[str, Any]:
+        if internable:
+            key = _canonical(node)
+            if key in shared:
+                digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+                name = _INTERNED_PREFIX + digest
+                if name not in interned:
+                    interned[name] = _map_subschemas(node, rewrite)
+                return {"$ref": f"#/definitions/{name}"}
+        return _map_subschemas(node, rewrite)
+
+    result = rewrite(schema, False)
+    result["definitions"] = {**result.get("definitions", {}), **interned}
+    return result
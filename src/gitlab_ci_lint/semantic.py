@@ -1,140 +1,303 @@
+import sys
+from collections import deque
 from typing import Any
 
+# Mappings from the YAML loaders are always plain dicts, so the loops over
+# top-level keys use `type(value) is dict` rather than the slower isinstance().
+
+# Top-level keys that configure the pipeline rather than define a job.
+# Interned so a lookup with an identical key object short-circuits on identity.
+RESERVED_KEYWORDS = frozenset(
+    map(
+        sys.intern,
+        (
+            "image",
+            "services",
+            "stages",
+            "types",
+            "before_script",
+            "after_script",
+            "variables",
+            "cache",
+            "include",
+            "workflow",
+            "default",
+            "pages",
+        ),
+    )
+)
+
+# Stages GitLab uses when a config does not declare its own
+DEFAULT_STAGES = ("build", "test", "deploy")
+
 
 def get_jobs(config: dict[str, Any]) -> dict[str, Any]:
     """Extract job definitions from config, excluding hidden jobs and keywords."""
-    jobs = {}
-    reserved_keywords = {
-        "image",
-        "services",
-        "stages",
-        "types",
-        "before_script",
-        "after_script",
-        "variables",
-        "cache",
-        "include",
-        "workflow",
-        "default",
-        "pages",
+    return {
+        key: value
+        for key, value in config.items()
+        if not key.startswith(".") and key not in RESERVED_KEYWORDS and type(value) is dict
     }
 
-    for key, value in config.items():
-        if key.startswith("."):
-            continue
-        if key in reserved_keywords:
-            continue
-        if isinstance(value, dict):
-            jobs[key] = value
 
-    return jobs
+def _check_job_needs(
+    job_name: str, job_def: dict[str, Any], job_names: frozenset[str], errors: list[str]
+) -> None:
+    """Append an error for each local 'needs' entry of one job that does not exist."""
+    needs = job_def.get("needs")
+    if not isinstance(needs, list):
+        return  # Absent, or a type error that schema validation reports
 
+    for need in needs:
+        if isinstance(need, dict):
+            # needs can refer to jobs in other pipelines (project key),
+            # strictly local jobs must exist.
+            if "project" in need:
+                continue
+            target = need.get("job")
+        elif isinstance(need, str):
+            target = need
+        else:
+            continue  # Schema validation reports this
 
-def check_needs(config: dict[str, Any]) -> list[str]:
-    """Verify that jobs listed in 'needs' actually exist."""
-    errors = []
-    jobs = get_jobs(config)
-    job_names = set(jobs.keys())
+        if target and target not in job_names:
+            errors.append(f"Job '{job_name}' needs '{target}', which does not exist in this file.")
 
-    for job_name, job_def in jobs.items():
-        if "needs" not in job_def:
-            continue
 
-        needs = job_def["needs"]
-        if not isinstance(needs, list):
-            continue  # Schema validation handles this
+def _defined_stages(config: dict[str, Any]) -> frozenset[str] | None:
+    """Return the stage names a config declares, or None if 'stages' is malformed."""
+    stages = config.get("stages", DEFAULT_STAGES)
+    if not isinstance(stages, (list, tuple)):
+        return None  # Schema validation reports this
 
-        for need in needs:
-            target = need.get("job") if isinstance(need, dict) else need
+    # GitLab flattens nested stage lists
+    defined = set()
+    for stage in stages:
+        if isinstance(stage, list):
+            defined.update(s for s in stage if isinstance(s, str))
+        elif isinstance(stage, str):
+            defined.add(stage)
+    return frozenset(defined)
 
-            # needs can refer to jobs in other pipelines (project key),
-            # strictly local jobs must exist.
-            is_local_need = isinstance(need, str) or (
-                isinstance(need, dict) and "project" not in need
-            )
-            if target and target not in job_names and is_local_need:
-                errors.append(
-                    f"Job '{job_name}' needs '{target}', which does not exist in this file."
-                )
+
+def _check_job_stage(
+    job_name: str, job_def: dict[str, Any], defined_stages: frozenset[str], errors: list[str]
+) -> None:
+    """Append an error if one job uses a stage that is not defined."""
+    stage = job_def.get("stage")
+    if stage and isinstance(stage, str) and stage not in defined_stages:
+        errors.append(f"Job '{job_name}' assignment to stage '{stage}' which is not defined.")
+
+
+def _check_key_extends(
+    key: str, value: dict[str, Any], all_keys: frozenset[str], errors: list[str]
+) -> None:
+    """Append an error for each 'extends' parent of one key that does not exist."""
+    extends = value.get("extends")
+    if not extends:
+        return
+
+    if isinstance(extends, str):
+        extends = [extends]
+
+    for parent in extends:
+        if parent not in all_keys:
+            errors.append(f"Job '{key}' extends '{parent}', which does not exist.")
+
+
+def check_needs(
+    config: dict[str, Any],
+    jobs: dict[str, Any] | None = None,
+    job_names: frozenset[str] | None = None,
+) -> list[str]:
+    """Verify that jobs listed in 'needs' actually exist."""
+    errors = []
+    if jobs is None:
+        jobs = get_jobs(config)
+    if job_names is None:
+        job_names = frozenset(jobs)
+
+    for job_name, job_def in jobs.items():
+        _check_job_needs(job_name, job_def, job_names, errors)
 
     return errors
 
 
-def check_stages(config: dict[str, Any]) -> list[str]:
+def check_stages(config: dict[str, Any], jobs: dict[str, Any] | None = None) -> list[str]:
     """Verify that jobs rely on defined stages."""
     errors = []
-    jobs = get_jobs(config)
-    defined_stages = set(config.get("stages", ["build", "test", "deploy"]))
+    if jobs is None:
+        jobs = get_jobs(config)
+    defined_stages = _defined_stages(config)
+    if defined_stages is None:
+        return errors
 
     for job_name, job_def in jobs.items():
-        stage = job_def.get("stage")
-        if stage and stage not in defined_stages:
-            errors.append(f"Job '{job_name}' assignment to stage '{stage}' which is not defined.")
+        _check_job_stage(job_name, job_def, defined_stages, errors)
 
     return errors
 
 
-def check_extends(config: dict[str, Any]) -> list[str]:
+def check_extends(config: dict[str, Any], all_keys: frozenset[str] | None = None) -> list[str]:
     """Verify 'extends' references exist (including hidden jobs)."""
     errors = []
     # All keys can be extended, including hidden ones
-    all_keys = set(config.keys())
+    if all_keys is None:
+        all_keys = frozenset(config)
 
     for key, value in config.items():
-        if not isinstance(value, dict):
-            continue
+        if type(value) is dict:
+            _check_key_extends(key, value, all_keys, errors)
 
-        extends = value.get("extends")
-        if not extends:
+    return errors
+
+
+def check_all(
+    config: dict[str, Any],
+    jobs: dict[str, Any],
+    job_names: frozenset[str],
+    all_keys: frozenset[str],
+) -> list[str]:
+    """Run the needs, stages and extends checks in a single pass over the config.
+
+    Finds the same errors as the three separate checks, grouped per key
+    instead of per check.
+    """
+    errors = []
+    defined_stages = _defined_stages(config)
+
+    for key, value in config.items():
+        if type(value) is not dict:
             continue
+        if key in jobs:
+            _check_job_needs(key, value, job_names, errors)
+            if defined_stages is not None:
+                _check_job_stage(key, value, defined_stages, errors)
+        _check_key_extends(key, value, all_keys, errors)
 
-        if isinstance(extends, str):
-            extends = [extends]
+    return errors
 
-        for parent in extends:
-            if parent not in all_keys:
-                errors.append(f"Job '{key}' extends '{parent}', which does not exist.")
 
+def lint_all(config: dict[str, Any]) -> list[str]:
+    """Run every semantic check on a config, extracting its jobs only once."""
+    jobs = get_jobs(config)
+    errors = check_all(config, jobs, frozenset(jobs), frozenset(config))
+    errors.extend(check_circular_extends(config))
     return errors
 
 
+def _shortest_cycle(root: int, graph: list[list[int]], members: set[int]) -> list[int]:
+    """Return the shortest extends path from ``root`` back to itself within an SCC.
+
+    The SCC stack order is only a path for simple cycles; a breadth-first
+    search gives a chain that really exists in the config.
+    """
+    previous: dict[int, int] = {}
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        for parent in graph[node]:
+            if parent in members and parent not in previous:
+                previous[parent] = node
+                if parent == root:
+                    queue.clear()
+                    break
+                queue.append(parent)
+
+    path = [root]
+    node = previous[root]
+    while node != root:
+        path.append(node)
+        node = previous[node]
+    path.append(root)
+    path.reverse()
+    return path
+
+
 def check_circular_extends(config: dict[str, Any]) -> list[str]:
-    """Detect circular dependencies in 'extends'."""
+    """Detect circular dependencies in 'extends'.
+
+    Runs a single iterative Tarjan SCC pass over the extends graph, so each
+    cycle is reported once no matter how many keys lead into it.
+    """
     errors = []
 
-    valid_keys = {k: v for k, v in config.items() if isinstance(v, dict)}
-
-    for key in valid_keys:
-        visited = set()
-        current = key
-        path = [key]
-
-        while True:
-            if current in visited:
-                errors.append(f"Circular dependency detected in 'extends': {' -> '.join(path)}")
-                break
-
-            visited.add(current)
-            job_def = valid_keys.get(current)
-            if not job_def:
-                break
-
-            extends = job_def.get("extends")
-            if not extends:
-                break
-
-            # If multiple extends, just pick the first one for simple cycle check or check all?
-            # A job can extend a list. We should BFS/DFS.
-            # Simplified: just check direct single inheritance chains or basic validation
-            if isinstance(extends, str):
-                current = extends
-                path.append(current)
-            elif isinstance(extends, list) and extends:
-                # Checking all paths is costlier, but let's just check the first for now
-                # or implement proper DFS. Let's do proper DFS for 'key'.
-                # Actually, let's skip complex graph logic for this iteration to keep it simple and robust.
-                break
+    # Nodes are integer ids into `names`; per-node state lives in flat arrays
+    defs = [(k, v) for k, v in config.items() if type(v) is dict]
+    names = [k for k, _ in defs]
+    ids = {name: i for i, name in enumerate(names)}
+
+    parents: list[list[int]] = []
+    for _, value in defs:
+        extends = value.get("extends")
+        if isinstance(extends, str):
+            extends = (extends,)
+        elif not isinstance(extends, list):
+            parents.append([])
+            continue
+        # Missing parents are reported by check_extends
+        parents.append([ids[p] for p in extends if isinstance(p, str) and p in ids])
+
+    # A parent that extends nothing (the usual base template) cannot be on a
+    # cycle, so its edges are dropped before the SCC pass
+    graph = [[p for p in edges if parents[p]] for edges in parents]
+
+    n = len(names)
+    visited = bytearray(n)
+    on_stack = bytearray(n)
+    index = [0] * n
+    lowlink = [0] * n
+    counter = 0
+    stack: list[int] = []
+
+    for root in range(n):
+        # A key that extends nothing cannot start a cycle
+        if visited[root] or not graph[root]:
+            continue
+
+        visited[root] = on_stack[root] = 1
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        work = [(root, iter(graph[root]))]
+
+        while work:
+            node, successors = work[-1]
+            for parent in successors:
+                if not visited[parent]:
+                    visited[parent] = on_stack[parent] = 1
+                    index[parent] = lowlink[parent] = counter
+                    counter += 1
+                    stack.append(parent)
+                    work.append((parent, iter(graph[parent])))
+                    break
+                if on_stack[parent] and index[parent] < lowlink[node]:
+                    lowlink[node] = index[parent]
             else:
-                break
+                # All successors visited: propagate lowlink and pop a finished SCC
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    if lowlink[node] < lowlink[caller]:
+                        lowlink[caller] = lowlink[node]
+                if lowlink[node] != index[node]:
+                    continue
 
-    return list(set(errors))  # dedupe
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component.append(member)
+                    if member == node:
+                        break
+                component.reverse()
+
+                if len(component) > 1 or node in graph[node]:
+                    path = _shortest_cycle(component[0], graph, set(component))
+                    message = " -> ".join(names[i] for i in path)
+                    others = [names[i] for i in component if i not in path]
+                    if others:
+                        message += f" (also involved: {', '.join(others)})"
+                    errors.append(f"Circular dependency detected in 'extends': {message}")
+
+    return errors
@@ -80,9 +80,13 @@ build:
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def linter() -> GitLabCILinter:
-    """Return fresh linter instance."""
+    """Return a linter shared by the whole session.
+
+    Building one compiles the schema validators; lint() keeps no state beyond
+    a content-keyed result cache, so sharing it is safe.
+    """
     return GitLabCILinter()
 
 
@@ -1,12 +1,20 @@
 """End-to-end tests for the gitlab-ci-lint CLI."""
 
 import json
+import os
+import subprocess
+import sys
 from pathlib import Path
 
+import pytest
 from click.testing import CliRunner
 
+from gitlab_ci_lint import cli as cli_module
 from gitlab_ci_lint.cli import cli
 
+# The CLI keeps one linter per process; sharing a worker builds it once
+pytestmark = pytest.mark.xdist_group("cli")
+
 
 class TestCLIBasicInvocation:
     """Tests for basic CLI invocation."""
@@ -18,6 +26,22 @@ class TestCLIBasicInvocation:
         assert "Usage:" in result.output or "usage:" in result.output.lower()
         assert "files" in result.output.lower()
 
+    def test_help_skips_heavy_imports(self):
+        """--help should not import the linter or rich."""
+        code = (
+            "import sys\n"
+            "from gitlab_ci_lint.cli import cli\n"
+            "try:\n"
+            "    cli(['--help'])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted(m for m in ('gitlab_ci_lint.linter', 'jsonschema', 'rich') if m in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
     def test_valid_file(self, cli_runner: CliRunner, temp_yaml_file, valid_yaml_content: str):
         """Valid file should exit with code 0."""
         yaml_file = temp_yaml_file(valid_yaml_content)
@@ -122,6 +146,34 @@ build:
         assert any("nonexistent" in err for err in data[str(yaml_file)])
 
 
+class TestCLIJsonBackends:
+    """JSON output must not depend on whether orjson is installed."""
+
+    @pytest.fixture(params=["orjson", "json"])
+    def backend(self, request, monkeypatch):
+        if request.param == "orjson":
+            pytest.importorskip("orjson")
+            assert cli_module._dumps is not cli_module._json_dumps
+        else:
+            monkeypatch.setattr(cli_module, "_dumps", cli_module._json_dumps)
+
+    @pytest.mark.usefixtures("backend")
+    def test_non_ascii_and_undecodable_paths(
+        self, cli_runner: CliRunner, temp_yaml_file, valid_yaml_content: str
+    ):
+        """Non-ASCII text is written as UTF-8; undecodable file names still serialize."""
+        undecodable = temp_yaml_file(valid_yaml_content, os.fsdecode(b"bad\xff.yml"))
+        umlaut = temp_yaml_file("b\u00fcild:\n  needs: [missing]\n  script: echo\n", "\u00fc.yml")
+        result = cli_runner.invoke(cli, ["--format", "json", str(undecodable), str(umlaut)])
+        output = result.stdout_bytes.split(b"Aborted!")[0]
+        assert json.loads(output) == {
+            str(undecodable): [],
+            str(umlaut): ["Job 'b\u00fcild' needs 'missing', which does not exist in this file."],
+        }
+        assert "\u00fc.yml".encode() in output
+        assert b"\\u00fc" not in output
+
+
 class TestCLIMultipleFiles:
     """Tests for multiple file handling."""
 
@@ -163,6 +215,79 @@ build:
         assert str(file1) in data
         assert str(file2) in data
 
+    def test_parallel_jobs_match_serial(self, cli_runner: CliRunner, invalid_fixtures_dir: Path):
+        """Linting with a process pool should give the same results as a serial run."""
+        files = sorted(str(p) for p in invalid_fixtures_dir.glob("*.yml"))
+        serial = cli_runner.invoke(cli, ["--format", "json", "--jobs", "1", *files])
+        parallel = cli_runner.invoke(cli, ["--format", "json", "--jobs", "2", *files])
+        assert parallel.exit_code != 0
+        assert parallel.output == serial.output
+
+    def test_invalid_jobs_value(self, cli_runner: CliRunner, temp_yaml_file, valid_yaml_content):
+        """A job count below one should be rejected."""
+        yaml_file = temp_yaml_file(valid_yaml_content)
+        result = cli_runner.invoke(cli, ["--jobs", "0", str(yaml_file)])
+        assert result.exit_code == 2
+
+    def test_json_output_matches_json_dumps(
+        self, cli_runner: CliRunner, invalid_fixtures_dir: Path
+    ):
+        """Streamed JSON output should be identical to serializing all results at once."""
+        files = sorted(str(p) for p in invalid_fixtures_dir.glob("*.yml"))
+        result = cli_runner.invoke(cli, ["--format", "json", *files])
+        output = result.output.split("Aborted!")[0]
+        assert output == json.dumps(json.loads(output), indent=2) + "\n"
+        assert list(json.loads(output)) == files
+
+    def test_duplicate_paths_linted_once(
+        self, cli_runner: CliRunner, temp_yaml_file, valid_yaml_content: str
+    ):
+        """Passing the same path twice should report it once."""
+        yaml_file = str(temp_yaml_file(valid_yaml_content))
+        result = cli_runner.invoke(cli, [yaml_file, yaml_file])
+        assert result.exit_code == 0
+        assert result.output.count(yaml_file) == 1
+
+
+class TestCLIFailFast:
+    """Tests for the --fail-fast option."""
+
+    def test_text_stops_after_first_error(
+        self, cli_runner: CliRunner, temp_yaml_file, valid_yaml_content: str
+    ):
+        """Files after the first failing one should not be reported."""
+        valid = temp_yaml_file(valid_yaml_content, "valid.yml")
+        broken = temp_yaml_file("build:\n  needs: [missing]\n  script: echo\n", "broken.yml")
+        later = temp_yaml_file(valid_yaml_content, "later.yml")
+        result = cli_runner.invoke(cli, ["--fail-fast", str(valid), str(broken), str(later)])
+        assert result.exit_code != 0
+        # rich wraps error lines at the terminal width, splitting long tmp paths
+        output = result.output.replace("\n", "")
+        assert str(valid) in output
+        assert str(broken) in output
+        assert str(later) not in output
+
+    def test_json_stays_valid(self, cli_runner: CliRunner, temp_yaml_file, valid_yaml_content):
+        """Stopping early in JSON mode should still produce a complete JSON object."""
+        broken = temp_yaml_file("build:\n  needs: [missing]\n  script: echo\n", "broken.yml")
+        later = temp_yaml_file(valid_yaml_content, "later.yml")
+        result = cli_runner.invoke(
+            cli, ["--format", "json", "--fail-fast", str(broken), str(later)]
+        )
+        assert result.exit_code != 0
+        data = json.loads(result.output.split("Aborted!")[0])
+        assert list(data) == [str(broken)]
+
+    def test_without_fail_fast_reports_all(
+        self, cli_runner: CliRunner, temp_yaml_file, valid_yaml_content: str
+    ):
+        """Without the flag every file should be reported."""
+        broken = temp_yaml_file("build:\n  needs: [missing]\n  script: echo\n", "broken.yml")
+        later = temp_yaml_file(valid_yaml_content, "later.yml")
+        result = cli_runner.invoke(cli, [str(broken), str(later)])
+        assert result.exit_code != 0
+        assert str(later) in result.output
+
 
 class TestCLIWithFixtureFiles:
     """Tests using the fixture files."""
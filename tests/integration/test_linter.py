@@ -4,7 +4,10 @@ from pathlib import Path
 
 import pytest
 
-from gitlab_ci_lint.linter import GitLabCILinter
+from gitlab_ci_lint.linter import GitLabCILinter, _parse_yaml
+
+# Keep these on one xdist worker so the session linter is built only once
+pytestmark = pytest.mark.xdist_group("linter")
 
 
 class TestLintString:
@@ -40,6 +43,47 @@ job:
         assert len(errors) >= 1
         # Should mention the invalid property
 
+    def test_repeated_content_parsed_once(self, linter: GitLabCILinter):
+        """Linting identical content twice should reuse the cached parse."""
+        content = "build:\n  stage: build\n  script: echo parse-cache\n"
+        linter.clear_cache()
+        assert linter.lint(content) == linter.lint(content) == []
+        info = _parse_yaml.cache_info()
+        assert (info.hits, info.misses) == (1, 1)
+
+    def test_clear_cache(self, linter: GitLabCILinter, temp_yaml_file):
+        """clear_cache should empty both the parse cache and the lint_file cache."""
+        linter.lint("build:\n  script: echo clear-cache\n")
+        linter.lint_file(str(temp_yaml_file("build:\n  script: echo\n")))
+        assert linter._cache and _parse_yaml.cache_info().currsize
+        linter.clear_cache()
+        assert not linter._cache
+        assert _parse_yaml.cache_info().currsize == 0
+
+    def test_lint_file_skips_parse_cache(self, linter: GitLabCILinter, temp_yaml_file):
+        """File contents should not be kept alive by the lint() parse cache."""
+        linter.clear_cache()
+        assert linter.lint_file(str(temp_yaml_file("build:\n  script: echo\n"))) == []
+        assert _parse_yaml.cache_info().currsize == 0
+
+    def test_all_schema_errors_reported(self, linter: GitLabCILinter):
+        """Independent schema violations should each get their own error."""
+        content = """
+stages: 3
+
+build:
+  script: echo
+  artifacts:
+    paths: "should-be-array"
+
+test:
+  scrpt: echo
+"""
+        errors = linter.lint(content)
+        assert "Schema error at 'stages': 3 is not of type 'array'" in errors
+        assert any(e.startswith("Schema error at 'build.artifacts.paths'") for e in errors)
+        assert any("'scrpt' was unexpected" in e for e in errors)
+
     def test_semantic_error_needs(self, linter: GitLabCILinter):
         """Semantic error for invalid needs reference should be reported."""
         content = """
@@ -59,53 +103,18 @@ test:
         errors = linter.lint(content)
         assert any("nonexistent" in e for e in errors)
 
-    def test_semantic_error_stages(self, linter: GitLabCILinter):
-        """Semantic error for undefined stage should be reported."""
-        content = """
-stages:
-  - build
-
-deploy:
-  stage: deploy
-  script: echo deploy
-"""
-        errors = linter.lint(content)
-        assert any("deploy" in e and "stage" in e for e in errors)
-
-    def test_semantic_error_extends(self, linter: GitLabCILinter):
-        """Semantic error for missing template should be reported."""
-        content = """
-stages:
-  - build
-
-build:
-  stage: build
-  extends: .missing
-  script: echo build
-"""
-        errors = linter.lint(content)
-        assert any(".missing" in e for e in errors)
-
-    def test_multiple_errors(self, linter: GitLabCILinter):
-        """Multiple errors should all be reported."""
-        content = """
-stages:
-  - build
-
-job1:
-  stage: build
-  needs: [missing1]
-  script: echo
+    def test_bytes_input(self, linter: GitLabCILinter, valid_yaml_content: str):
+        """Raw bytes should lint the same as the decoded string."""
+        assert linter.lint(valid_yaml_content.encode("utf-8")) == []
+        errors = linter.lint(b"foo: [bar")
+        assert len(errors) == 1
+        assert "YAML" in errors[0]
 
-job2:
-  stage: build
-  extends: .missing2
-  script: echo
-"""
-        errors = linter.lint(content)
-        assert len(errors) >= 2
-        assert any("missing1" in e for e in errors)
-        assert any(".missing2" in e for e in errors)
+    def test_invalid_utf8_bytes(self, linter: GitLabCILinter):
+        """Undecodable bytes should be reported as a YAML error, not raise."""
+        errors = linter.lint(b"build:\n  script: \xff\xfe\xfa\n")
+        assert len(errors) == 1
+        assert "YAML" in errors[0]
 
     def test_empty_string(self, linter: GitLabCILinter):
         """Empty string should be handled gracefully."""
@@ -125,6 +134,55 @@ job2:
         assert len(errors) == 1
 
 
+class TestLintParsed:
+    """Tests for GitLabCILinter.lint_parsed() with pre-parsed configs."""
+
+    def test_valid_config(self, linter: GitLabCILinter):
+        """A valid config dict should return no errors."""
+        config = {"stages": ["build"], "build": {"stage": "build", "script": "echo"}}
+        assert linter.lint_parsed(config) == []
+
+    def test_semantic_error_stages(self, linter: GitLabCILinter):
+        """Semantic error for undefined stage should be reported."""
+        config = {"stages": ["build"], "deploy": {"stage": "deploy", "script": "echo deploy"}}
+        errors = linter.lint_parsed(config)
+        assert any("deploy" in e and "stage" in e for e in errors)
+
+    def test_semantic_error_extends(self, linter: GitLabCILinter):
+        """Semantic error for missing template should be reported."""
+        config = {
+            "stages": ["build"],
+            "build": {"stage": "build", "extends": ".missing", "script": "echo build"},
+        }
+        errors = linter.lint_parsed(config)
+        assert any(".missing" in e for e in errors)
+
+    def test_multiple_errors(self, linter: GitLabCILinter):
+        """Multiple errors should all be reported."""
+        config = {
+            "stages": ["build"],
+            "job1": {"stage": "build", "needs": ["missing1"], "script": "echo"},
+            "job2": {"stage": "build", "extends": ".missing2", "script": "echo"},
+        }
+        errors = linter.lint_parsed(config)
+        assert len(errors) >= 2
+        assert any("missing1" in e for e in errors)
+        assert any(".missing2" in e for e in errors)
+
+    def test_schema_error(self, linter: GitLabCILinter):
+        """Schema errors should be reported for parsed configs too."""
+        config = {"job": {"script": "echo", "artifacts": {"paths": "should-be-array"}}}
+        errors = linter.lint_parsed(config)
+        assert any(e.startswith("Schema error at 'job.artifacts.paths'") for e in errors)
+
+    @pytest.mark.parametrize("config", [None, {}, ["a", "list"], "scalar"])
+    def test_non_mapping(self, linter: GitLabCILinter, config):
+        """Anything other than a non-empty mapping should be rejected."""
+        errors = linter.lint_parsed(config)
+        assert len(errors) == 1
+        assert "not a dictionary" in errors[0]
+
+
 class TestLintFile:
     """Tests for GitLabCILinter.lint_file() method."""
 
@@ -166,6 +224,76 @@ build:
         errors = linter.lint_file(str(file_path))
         assert errors == []
 
+    def test_identical_files_share_result(self, temp_yaml_file):
+        """Files with identical content should be linted once and give equal results."""
+        linter = GitLabCILinter()  # fresh instance so the cache starts empty
+        content = "build:\n  stage: build\n  needs: [missing]\n  script: echo\n"
+        first = temp_yaml_file(content, "first.yml")
+        second = temp_yaml_file(content, "second.yml")
+        errors = linter.lint_file(str(first))
+        assert len(linter._cache) == 1
+        assert linter.lint_file(str(second)) == errors
+        assert len(linter._cache) == 1
+
+    def test_cached_result_is_not_shared(self, linter: GitLabCILinter, temp_yaml_file):
+        """Mutating a returned error list must not affect later results."""
+        file_path = temp_yaml_file("build:\n  needs: [missing]\n  script: echo\n")
+        errors = linter.lint_file(str(file_path))
+        errors.clear()
+        assert linter.lint_file(str(file_path)) != []
+
+    def test_large_non_mapping_file(self, linter: GitLabCILinter, temp_yaml_file):
+        """A large file whose top level is a list should fail without being constructed."""
+        content = "".join(f"- item{i}\n" for i in range(10_000))
+        assert len(content) > 64 * 1024
+        errors = linter.lint_file(str(temp_yaml_file(content)))
+        assert len(errors) == 1
+        assert "not a dictionary" in errors[0]
+
+    @pytest.mark.parametrize(
+        "tail",
+        [
+            "---\nbuild:\n  script: echo\n",  # a second document
+            "- !reference [.setup, script]\n",  # a tag the safe loader rejects
+            "- 0b_\n",  # resolves as int but does not construct
+        ],
+        ids=["multi-document", "unknown-tag", "bad-int"],
+    )
+    def test_large_and_small_files_agree(self, linter: GitLabCILinter, temp_yaml_file, tail):
+        """The large-file shortcut must report what the full parse reports."""
+        small = "- item\n" + tail
+        large = "".join(f"- item{i}\n" for i in range(10_000)) + tail
+        assert len(large) > 64 * 1024
+        # Same path for both, and only the first line: marks carry line numbers
+        small_errors = linter.lint_file(str(temp_yaml_file(small)))
+        large_errors = linter.lint_file(str(temp_yaml_file(large)))
+        assert small_errors != ["Invalid configuration: File is empty or not a dictionary"]
+        assert [e.splitlines()[0] for e in large_errors] == [
+            e.splitlines()[0] for e in small_errors
+        ]
+
+    def test_large_comment_only_file(self, linter: GitLabCILinter, temp_yaml_file):
+        """A large file with no YAML document should be reported as empty."""
+        content = "# padding\n" * 10_000
+        errors = linter.lint_file(str(temp_yaml_file(content)))
+        assert len(errors) == 1
+        assert "empty" in errors[0].lower()
+
+    def test_large_mapping_file(self, linter: GitLabCILinter, temp_yaml_file):
+        """A large mapping should still go through the full lint."""
+        content = "".join(f"job{i}:\n  stage: build\n  script: echo {i}\n" for i in range(2_000))
+        content += "broken:\n  needs: [missing]\n  script: echo\n"
+        assert len(content) > 64 * 1024
+        errors = linter.lint_file(str(temp_yaml_file(content)))
+        assert any("missing" in e for e in errors)
+
+    def test_large_file_syntax_error(self, linter: GitLabCILinter, temp_yaml_file):
+        """YAML syntax errors in large files should still be reported as such."""
+        content = "# padding\n" * 10_000 + "foo: [bar\n"
+        errors = linter.lint_file(str(temp_yaml_file(content)))
+        assert len(errors) == 1
+        assert "YAML" in errors[0]
+
 
 class TestLintValidFixtures:
     """Test all valid fixture files to ensure they validate correctly."""
@@ -1,6 +1,17 @@
 """Integration tests for schema loading and caching."""
 
-from gitlab_ci_lint.schema import load_schema
+import json
+import os
+import pickle
+from pathlib import Path
+
+import fastjsonschema
+import pytest
+
+from gitlab_ci_lint import schema as schema_package
+from gitlab_ci_lint.linter import GitLabCILinter
+from gitlab_ci_lint.schema import load_compiled_validator, load_schema, load_validator
+from gitlab_ci_lint.schema.optimize import intern_subschemas
 
 
 class TestSchemaLoading:
@@ -24,9 +35,136 @@ class TestSchemaLoading:
         schema2 = load_schema()
         assert schema1 is schema2  # Same object due to caching
 
+    def test_schema_is_read_only(self):
+        """The shared cached schema should reject mutation."""
+        schema = load_schema()
+        with pytest.raises(TypeError):
+            schema["type"] = "array"
+        with pytest.raises(TypeError):
+            schema["definitions"].clear()
+
     def test_schema_has_job_definitions(self):
         """Schema should have job-related definitions."""
         schema = load_schema()
         # The GitLab CI schema typically has definitions for jobs
         # This is a sanity check that we loaded the right schema
         assert "definitions" in schema or "properties" in schema or "$defs" in schema
+
+
+class TestCompiledValidator:
+    """Tests for the fastjsonschema-compiled validator."""
+
+    def test_compiled_validator_is_cached(self):
+        """Compiling the schema should happen once per process."""
+        assert load_compiled_validator() is load_compiled_validator()
+
+    def test_compiling_leaves_schema_untouched(self):
+        """Compiling the validator must not modify the cached schema."""
+        load_compiled_validator()
+        schema_path = Path(schema_package.__file__).parent / "ci.json"
+        expected = intern_subschemas(json.loads(schema_path.read_text(encoding="utf-8")))
+        assert load_schema() == expected
+
+    def test_compiled_validator_accepts_valid_config(self):
+        """A valid config should pass without raising."""
+        validate = load_compiled_validator()
+        validate({"build": {"script": "echo"}})
+
+    def test_compiled_validator_rejects_invalid_config(self):
+        """A schema violation should raise JsonSchemaException."""
+        validate = load_compiled_validator()
+        with pytest.raises(fastjsonschema.JsonSchemaException):
+            validate({"build": {"script": "echo", "artifacts": {"paths": "not-a-list"}}})
+
+    def test_compiled_validator_does_not_fill_defaults(self):
+        """Validation must not write schema defaults into the config."""
+        config = {"build": {"script": "echo"}}
+        load_compiled_validator()(config)
+        assert config == {"build": {"script": "echo"}}
+
+
+class TestValidator:
+    """Tests for the shared jsonschema validator."""
+
+    def test_validator_is_shared(self):
+        """The validator should be built once and reused by every linter."""
+        assert load_validator() is load_validator()
+        assert GitLabCILinter()._validator is GitLabCILinter()._validator
+
+    def test_validator_reports_errors(self):
+        """iter_errors should report schema violations in the config."""
+        config = {"build": {"script": "echo", "artifacts": {"paths": "not-a-list"}}}
+        assert list(load_validator().iter_errors(config))
+        assert not list(load_validator().iter_errors({"build": {"script": "echo"}}))
+
+
+class TestSchemaDiskCache:
+    """Tests for the on-disk schema and validator caches."""
+
+    @pytest.fixture
+    def cache_paths(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        """Redirect both cache files into a temporary directory."""
+        pickle_path = tmp_path / "ci.json.pkl"
+        validator_path = tmp_path / "_ci_validator.py"
+        monkeypatch.setattr(schema_package, "_PICKLE_PATH", str(pickle_path))
+        monkeypatch.setattr(schema_package, "_VALIDATOR_PATH", str(validator_path))
+        return pickle_path, validator_path
+
+    def test_pickle_written_and_reused(self, cache_paths):
+        """The parsed schema should be pickled once and then read back."""
+        pickle_path, _ = cache_paths
+        schema = load_schema.__wrapped__()
+        assert pickle_path.exists()
+        assert load_schema.__wrapped__() == schema == load_schema()
+
+    def test_stale_pickle_ignored(self, cache_paths):
+        """A pickle older than ci.json should be rebuilt from the JSON."""
+        pickle_path, _ = cache_paths
+        pickle_path.write_bytes(pickle.dumps({"stale": True}))
+        os.utime(pickle_path, (0, 0))
+        assert load_schema.__wrapped__() == load_schema()
+        assert pickle.loads(pickle_path.read_bytes()) == load_schema()
+
+    def test_corrupt_pickle_ignored(self, cache_paths):
+        """An unreadable pickle should fall back to parsing the JSON."""
+        pickle_path, _ = cache_paths
+        pickle_path.write_bytes(b"not a pickle")
+        assert load_schema.__wrapped__() == load_schema()
+
+    def test_unwritable_cache_dir(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        """A read-only install location should not break schema loading."""
+        missing = tmp_path / "missing"
+        monkeypatch.setattr(schema_package, "_PICKLE_PATH", str(missing / "ci.json.pkl"))
+        monkeypatch.setattr(schema_package, "_VALIDATOR_PATH", str(missing / "_ci_validator.py"))
+        assert load_schema.__wrapped__() == load_schema()
+        validate = load_compiled_validator.__wrapped__()
+        with pytest.raises(fastjsonschema.JsonSchemaException):
+            validate({"build": {"script": 1}})
+
+    def test_generated_validator_written_and_reused(self, cache_paths):
+        """The compiled validator source should be written and imported on later loads."""
+        _, validator_path = cache_paths
+        validate = load_compiled_validator.__wrapped__()
+        assert validator_path.exists()
+        validate({"build": {"script": "echo"}})
+
+        mtime = validator_path.stat().st_mtime_ns
+        reloaded = load_compiled_validator.__wrapped__()
+        assert validator_path.stat().st_mtime_ns == mtime
+        with pytest.raises(fastjsonschema.JsonSchemaException):
+            reloaded({"build": {"script": "echo", "artifacts": {"paths": "not-a-list"}}})
+
+    def test_stale_generated_validator_rebuilt(self, cache_paths):
+        """A generated validator older than its sources should be regenerated."""
+        _, validator_path = cache_paths
+        validator_path.write_text(
+            f"VERSION = {fastjsonschema.VERSION!r}\n\ndef validate(data, custom_formats={{}}, name_prefix=None):\n    return data\n"
+        )
+        os.utime(validator_path, (0, 0))
+        validate = load_compiled_validator.__wrapped__()
+        with pytest.raises(fastjsonschema.JsonSchemaException):
+            validate({"build": {"script": 1}})
+
+    def test_compile_options_are_a_cache_source(self):
+        """Editing the compile options in the schema module must invalidate the caches."""
+        assert schema_package.__file__ in schema_package._CACHE_SOURCES
@@ -0,0 +1,85 @@
+"""Unit tests for schema canonicalization."""
+
+import copy
+
+import jsonschema
+import pytest
+
+from gitlab_ci_lint.schema.optimize import intern_subschemas
+
+# Large enough to clear the interning size threshold
+SHARED = {
+    "type": "object",
+    "description": "A repeated subschema with enough content to be worth sharing.",
+    "properties": {"name": {"type": "string"}, "when": {"enum": ["always", "never"]}},
+    "additionalProperties": False,
+}
+
+
+def _schema() -> dict:
+    return {
+        "$schema": "http://json-schema.org/draft-07/schema#",
+        "type": "object",
+        "properties": {
+            "a": copy.deepcopy(SHARED),
+            "b": {"anyOf": [{"type": "string"}, copy.deepcopy(SHARED)]},
+            "c": {"type": "array", "items": copy.deepcopy(SHARED)},
+            "small": {"type": "string"},
+            "also_small": {"type": "string"},
+        },
+        "definitions": {"named": {"type": "integer"}},
+    }
+
+
+def _interned_names(schema: dict) -> list[str]:
+    return [name for name in schema["definitions"] if name.startswith("_interned_")]
+
+
+class TestInternSubschemas:
+    """Tests for intern_subschemas()."""
+
+    def test_repeated_subschema_shared(self):
+        """Each occurrence of a repeated subschema should become the same $ref."""
+        result = intern_subschemas(_schema())
+        (name,) = _interned_names(result)
+        ref = {"$ref": f"#/definitions/{name}"}
+        assert result["properties"]["a"] == ref
+        assert result["properties"]["b"]["anyOf"][1] == ref
+        assert result["properties"]["c"]["items"] == ref
+        assert result["definitions"][name] == SHARED
+
+    def test_small_and_named_schemas_untouched(self):
+        """Small duplicates stay inline and named definitions keep their place."""
+        result = intern_subschemas(_schema())
+        assert result["properties"]["small"] == {"type": "string"}
+        assert result["definitions"]["named"] == {"type": "integer"}
+
+    def test_input_not_modified(self):
+        """The input schema should be left as it was."""
+        schema = _schema()
+        intern_subschemas(schema)
+        assert schema == _schema()
+
+    def test_no_duplicates_returns_input(self):
+        """A schema without repeated subschemas needs no rewriting."""
+        schema = {"type": "object", "properties": {"a": SHARED}}
+        assert intern_subschemas(schema) is schema
+
+    @pytest.mark.parametrize(
+        "instance",
+        [
+            {"a": {"name": "x"}},
+            {"a": {"name": 1}},
+            {"b": {"when": "sometimes"}},
+            {"c": [{"name": "x"}, {"extra": True}]},
+        ],
+    )
+    def test_validation_unchanged(self, instance: dict):
+        """The rewritten schema should report exactly the same errors."""
+        before = jsonschema.Draft7Validator(_schema())
+        after = jsonschema.Draft7Validator(intern_subschemas(_schema()))
+
+        def errors(validator):
+            return sorted((list(e.path), e.message) for e in validator.iter_errors(instance))
+
+        assert errors(after) == errors(before)
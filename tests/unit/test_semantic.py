@@ -3,11 +3,13 @@
 import pytest
 
 from gitlab_ci_lint.semantic import (
+    check_all,
     check_circular_extends,
     check_extends,
     check_needs,
     check_stages,
     get_jobs,
+    lint_all,
 )
 
 
@@ -50,94 +52,121 @@ class TestGetJobs:
         """Test that get_jobs correctly extracts job definitions."""
         assert set(get_jobs(config).keys()) == expected_jobs
 
+    def test_preserves_order_and_values(self):
+        """Jobs should come back in config order, mapped to the original definitions."""
+        build, test = {"script": "b"}, {"script": "t"}
+        config = {"test": test, "stages": ["build"], ".hidden": {}, "build": build}
+        jobs = get_jobs(config)
+        assert type(jobs) is dict
+        assert list(jobs) == ["test", "build"]
+        assert jobs["build"] is build and jobs["test"] is test
+
 
 class TestCheckNeeds:
     """Tests for check_needs() function."""
 
-    def test_valid_needs_reference(self):
-        """Jobs with valid needs references should not produce errors."""
-        config = {
-            "stages": ["build", "test"],
-            "build": {"stage": "build", "script": "echo"},
-            "test": {"stage": "test", "script": "echo", "needs": ["build"]},
-        }
-        errors = check_needs(config)
-        assert errors == []
-
-    def test_unknown_job_in_needs(self):
-        """Referencing unknown job in needs should produce error."""
-        config = {
-            "stages": ["build", "test"],
-            "build": {"stage": "build", "script": "echo"},
-            "test": {"stage": "test", "script": "echo", "needs": ["nonexistent"]},
-        }
-        errors = check_needs(config)
-        assert len(errors) == 1
-        assert "nonexistent" in errors[0]
-        assert "test" in errors[0]
-
-    def test_empty_needs_array(self):
-        """Empty needs array should not produce errors."""
-        config = {
-            "stages": ["build"],
-            "build": {"stage": "build", "script": "echo", "needs": []},
-        }
-        errors = check_needs(config)
-        assert errors == []
-
-    def test_needs_with_dict_syntax(self):
-        """Needs with dict syntax {job: name} should work."""
-        config = {
-            "stages": ["build", "test"],
-            "build": {"stage": "build", "script": "echo"},
-            "test": {"stage": "test", "script": "echo", "needs": [{"job": "build"}]},
-        }
-        errors = check_needs(config)
-        assert errors == []
-
-    def test_needs_with_dict_syntax_nonexistent(self):
-        """Needs with dict syntax referencing nonexistent job should error."""
-        config = {
-            "stages": ["build", "test"],
-            "build": {"stage": "build", "script": "echo"},
-            "test": {"stage": "test", "script": "echo", "needs": [{"job": "missing"}]},
-        }
-        errors = check_needs(config)
-        assert len(errors) == 1
-        assert "missing" in errors[0]
-
-    def test_multiple_needs_errors(self):
-        """Multiple invalid needs should produce multiple errors."""
-        config = {
-            "stages": ["build"],
-            "build": {"stage": "build", "script": "echo", "needs": ["missing1", "missing2"]},
-        }
-        errors = check_needs(config)
-        assert len(errors) == 2
-        assert any("missing1" in e for e in errors)
-        assert any("missing2" in e for e in errors)
-
-    def test_needs_with_project_ignored(self):
-        """Needs with project key (cross-project) should not be validated locally."""
-        config = {
-            "stages": ["build"],
-            "build": {
-                "stage": "build",
-                "script": "echo",
-                "needs": [{"project": "other/project", "job": "external-job"}],
-            },
-        }
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            (
+                {
+                    "stages": ["build", "test"],
+                    "build": {"stage": "build", "script": "echo"},
+                    "test": {"stage": "test", "script": "echo", "needs": ["build"]},
+                },
+                [],
+            ),
+            (
+                {
+                    "stages": ["build", "test"],
+                    "build": {"stage": "build", "script": "echo"},
+                    "test": {"stage": "test", "script": "echo", "needs": ["nonexistent"]},
+                },
+                [("nonexistent", "test")],
+            ),
+            (
+                {"stages": ["build"], "build": {"stage": "build", "script": "echo", "needs": []}},
+                [],
+            ),
+            (
+                {
+                    "stages": ["build", "test"],
+                    "build": {"stage": "build", "script": "echo"},
+                    "test": {"stage": "test", "script": "echo", "needs": [{"job": "build"}]},
+                },
+                [],
+            ),
+            (
+                {
+                    "stages": ["build", "test"],
+                    "build": {"stage": "build", "script": "echo"},
+                    "test": {"stage": "test", "script": "echo", "needs": [{"job": "missing"}]},
+                },
+                [("missing",)],
+            ),
+            (
+                {
+                    "stages": ["build"],
+                    "build": {
+                        "stage": "build",
+                        "script": "echo",
+                        "needs": ["missing1", "missing2"],
+                    },
+                },
+                [("missing1",), ("missing2",)],
+            ),
+            (
+                # Cross-project needs are not validated locally
+                {
+                    "stages": ["build"],
+                    "build": {
+                        "stage": "build",
+                        "script": "echo",
+                        "needs": [{"project": "other/project", "job": "external-job"}],
+                    },
+                },
+                [],
+            ),
+            ({"stages": ["build"], "build": {"stage": "build", "script": "echo"}}, []),
+            (
+                # Malformed entries are left to schema validation
+                {
+                    "stages": ["build"],
+                    "build": {
+                        "stage": "build",
+                        "script": "echo",
+                        "needs": [42, None, {"artifacts": True}, "missing"],
+                    },
+                },
+                [("missing",)],
+            ),
+        ],
+        ids=[
+            "valid-reference",
+            "unknown-job",
+            "empty-needs",
+            "dict-syntax",
+            "dict-syntax-unknown",
+            "multiple-errors",
+            "project-ignored",
+            "no-needs",
+            "malformed-entries-skipped",
+        ],
+    )
+    def test_check_needs(self, config: dict, expected: list[tuple[str, ...]]):
+        """Each error should mention every expected fragment, in order."""
         errors = check_needs(config)
-        assert errors == []
+        assert len(errors) == len(expected)
+        for error, fragments in zip(errors, expected, strict=True):
+            assert all(fragment in error for fragment in fragments)
 
-    def test_no_needs_in_config(self):
-        """Jobs without needs should not produce errors."""
+    def test_precomputed_jobs(self):
+        """Passing a precomputed jobs dict should give the same result."""
         config = {
-            "stages": ["build"],
-            "build": {"stage": "build", "script": "echo"},
+            "build": {"script": "echo", "needs": ["missing"]},
+            ".template": {"script": "echo"},
         }
-        errors = check_needs(config)
-        assert errors == []
+        assert check_needs(config, get_jobs(config)) == check_needs(config)
 
 
 class TestCheckStages:
@@ -193,133 +222,238 @@ class TestCheckStages:
         errors = check_stages(config)
         assert errors == []
 
-
-class TestCheckExtends:
-    """Tests for check_extends() function."""
-
-    def test_valid_extends(self):
-        """Job extending existing template should not produce errors."""
+    def test_nested_stage_lists(self):
+        """Nested stage lists are flattened, as GitLab does."""
         config = {
-            "stages": ["build"],
-            ".template": {"script": "echo"},
-            "build": {"stage": "build", "extends": ".template"},
+            "stages": ["build", ["test", "deploy"]],
+            "deploy-job": {"stage": "deploy", "script": "echo"},
         }
-        errors = check_extends(config)
-        assert errors == []
+        assert check_stages(config) == []
 
-    def test_unknown_template(self):
-        """Extending non-existent template should produce error."""
-        config = {
-            "stages": ["build"],
-            "build": {"stage": "build", "extends": ".missing-template"},
-        }
-        errors = check_extends(config)
-        assert len(errors) == 1
-        assert ".missing-template" in errors[0]
-        assert "build" in errors[0]
+    def test_malformed_stages_skipped(self):
+        """A non-list 'stages' is left to schema validation instead of crashing."""
+        config = {"stages": 3, "build-job": {"stage": "build", "script": "echo"}}
+        assert check_stages(config) == []
 
-    def test_multiple_extends_all_exist(self):
-        """Multiple extends with all templates existing should not produce errors."""
-        config = {
-            "stages": ["build"],
-            ".template-a": {"script": "a"},
-            ".template-b": {"script": "b"},
-            "build": {"stage": "build", "extends": [".template-a", ".template-b"]},
-        }
-        errors = check_extends(config)
-        assert errors == []
+    def test_precomputed_jobs(self):
+        """Passing a precomputed jobs dict should give the same result."""
+        config = {"stages": ["build"], "deploy-job": {"stage": "deploy", "script": "echo"}}
+        assert check_stages(config, get_jobs(config)) == check_stages(config)
 
-    def test_multiple_extends_one_missing(self):
-        """Multiple extends with one missing should produce error for missing."""
-        config = {
-            "stages": ["build"],
-            ".template-a": {"script": "a"},
-            "build": {"stage": "build", "extends": [".template-a", ".missing"]},
-        }
-        errors = check_extends(config)
-        assert len(errors) == 1
-        assert ".missing" in errors[0]
 
-    def test_extends_regular_job(self):
-        """Extending a regular job (not template) is valid in GitLab."""
-        config = {
-            "stages": ["build", "test"],
-            "build": {"stage": "build", "script": "echo"},
-            "test": {"stage": "test", "extends": "build"},
-        }
-        errors = check_extends(config)
-        assert errors == []
+class TestCheckExtends:
+    """Tests for check_extends() function."""
 
-    def test_no_extends(self):
-        """Jobs without extends should not produce errors."""
-        config = {
-            "stages": ["build"],
-            "build": {"stage": "build", "script": "echo"},
-        }
+    @pytest.mark.parametrize(
+        "config,expected",
+        [
+            (
+                {
+                    "stages": ["build"],
+                    ".template": {"script": "echo"},
+                    "build": {"stage": "build", "extends": ".template"},
+                },
+                [],
+            ),
+            (
+                {"stages": ["build"], "build": {"stage": "build", "extends": ".missing-template"}},
+                [(".missing-template", "build")],
+            ),
+            (
+                {
+                    "stages": ["build"],
+                    ".template-a": {"script": "a"},
+                    ".template-b": {"script": "b"},
+                    "build": {"stage": "build", "extends": [".template-a", ".template-b"]},
+                },
+                [],
+            ),
+            (
+                {
+                    "stages": ["build"],
+                    ".template-a": {"script": "a"},
+                    "build": {"stage": "build", "extends": [".template-a", ".missing"]},
+                },
+                [(".missing",)],
+            ),
+            (
+                # Extending a regular job (not a template) is valid in GitLab
+                {
+                    "stages": ["build", "test"],
+                    "build": {"stage": "build", "script": "echo"},
+                    "test": {"stage": "test", "extends": "build"},
+                },
+                [],
+            ),
+            ({"stages": ["build"], "build": {"stage": "build", "script": "echo"}}, []),
+        ],
+        ids=[
+            "valid",
+            "unknown-template",
+            "multiple-all-exist",
+            "multiple-one-missing",
+            "regular-job",
+            "no-extends",
+        ],
+    )
+    def test_check_extends(self, config: dict, expected: list[tuple[str, ...]]):
+        """Each error should mention every expected fragment, in order."""
         errors = check_extends(config)
-        assert errors == []
+        assert len(errors) == len(expected)
+        for error, fragments in zip(errors, expected, strict=True):
+            assert all(fragment in error for fragment in fragments)
 
 
 class TestCheckCircularExtends:
     """Tests for check_circular_extends() function."""
 
-    def test_no_extends(self):
-        """Config without extends should not produce errors."""
-        config = {
-            "stages": ["build"],
-            "build": {"stage": "build", "script": "echo"},
-        }
+    @pytest.mark.parametrize(
+        "config,expected_cycles",
+        [
+            ({"stages": ["build"], "build": {"stage": "build", "script": "echo"}}, []),
+            (
+                {
+                    ".base": {"script": "base"},
+                    ".derived": {"extends": ".base"},
+                    "build": {"extends": ".derived"},
+                },
+                [],
+            ),
+            ({"build": {"extends": "build", "script": "echo"}}, ["build -> build"]),
+            ({".a": {"extends": ".b"}, ".b": {"extends": ".a"}}, [".a -> .b -> .a"]),
+            (
+                {".a": {"extends": ".b"}, ".b": {"extends": ".c"}, ".c": {"extends": ".a"}},
+                [".a -> .b -> .c -> .a"],
+            ),
+            (
+                # a -> (b, c) -> d: shared ancestor, no cycle
+                {
+                    ".d": {"script": "d"},
+                    ".b": {"extends": ".d"},
+                    ".c": {"extends": ".d"},
+                    "a": {"extends": [".b", ".c"]},
+                },
+                [],
+            ),
+            (
+                {
+                    ".a": {"extends": [".base", ".b"]},
+                    ".b": {"extends": [".a"]},
+                    ".base": {"script": "echo"},
+                },
+                [".a -> .b -> .a"],
+            ),
+            (
+                # One SCC made of two overlapping cycles: report a real path, then the rest
+                {
+                    ".a": {"extends": ".b"},
+                    ".b": {"extends": [".a", ".c"]},
+                    ".c": {"extends": ".b"},
+                },
+                [".a -> .b -> .a (also involved: .c)"],
+            ),
+            (
+                # Jobs leading into a cycle do not produce duplicate errors
+                {
+                    ".a": {"extends": ".b"},
+                    ".b": {"extends": ".a"},
+                    "build": {"extends": ".a"},
+                    "test": {"extends": ".b"},
+                },
+                [".a -> .b -> .a"],
+            ),
+        ],
+        ids=[
+            "no-extends",
+            "chain",
+            "self",
+            "two-cycle",
+            "three-cycle",
+            "diamond",
+            "list-extends-cycle",
+            "overlapping-cycles",
+            "reported-once",
+        ],
+    )
+    def test_cycle_detection(self, config: dict, expected_cycles: list[str]):
+        """Each cycle should be reported once, as the path around it."""
         errors = check_circular_extends(config)
-        assert errors == []
+        assert errors == [
+            f"Circular dependency detected in 'extends': {cycle}" for cycle in expected_cycles
+        ]
+
+    def test_deep_chain_without_recursion(self):
+        """Chains far deeper than the recursion limit should be walked iteratively."""
+        depth = 5000
+        config = {f".t{i}": {"extends": f".t{i + 1}"} for i in range(depth)}
+        config[f".t{depth}"] = {"script": "echo"}
+        assert check_circular_extends(config) == []
 
-    def test_simple_chain_no_cycle(self):
-        """Simple extends chain without cycle should not produce errors."""
+        config[f".t{depth}"] = {"extends": ".t0"}
+        [error] = check_circular_extends(config)
+        assert error.startswith("Circular dependency detected in 'extends': .t0 -> .t1 -> ")
+        assert error.endswith(f".t{depth} -> .t0")
+
+
+class TestCheckAll:
+    """Tests for check_all() single-pass checker."""
+
+    def test_matches_individual_checks(self):
+        """check_all should find the same errors as the individual checks."""
         config = {
-            ".base": {"script": "base"},
-            ".derived": {"extends": ".base"},
-            "build": {"extends": ".derived"},
+            "stages": ["build"],
+            ".template": {"extends": ".missing-template"},
+            "build": {"stage": "build", "script": "echo", "needs": ["missing1"]},
+            "deploy-job": {"stage": "deploy", "extends": ".template", "needs": [{"job": "x"}]},
+            "variables": {"FOO": "bar"},
         }
-        errors = check_circular_extends(config)
-        assert errors == []
-
-    def test_self_reference(self):
-        """Self-extending job should produce circular error."""
+        jobs = get_jobs(config)
+        errors = check_all(config, jobs, frozenset(jobs), frozenset(config))
+        expected = check_needs(config) + check_stages(config) + check_extends(config)
+        assert sorted(errors) == sorted(expected)
+        assert len(errors) == 4
+
+    def test_valid_config(self):
+        """A valid config should produce no errors."""
         config = {
-            "build": {"extends": "build", "script": "echo"},
+            "stages": ["build", "test"],
+            ".template": {"script": "echo"},
+            "build": {"stage": "build", "extends": ".template"},
+            "test": {"stage": "test", "script": "echo", "needs": ["build"]},
         }
-        errors = check_circular_extends(config)
-        assert len(errors) == 1
-        assert "circular" in errors[0].lower()
-        assert "build" in errors[0]
+        jobs = get_jobs(config)
+        assert check_all(config, jobs, frozenset(jobs), frozenset(config)) == []
+
+
+class TestLintAll:
+    """Tests for lint_all() semantic entry point."""
 
-    def test_two_node_cycle(self):
-        """Two-node cycle (A -> B -> A) should produce error."""
+    def test_combines_all_checks(self):
+        """lint_all should report the check_all errors followed by extends cycles."""
         config = {
+            "build": {"stage": "missing", "needs": ["nope"], "extends": ".a"},
             ".a": {"extends": ".b"},
             ".b": {"extends": ".a"},
         }
-        errors = check_circular_extends(config)
-        assert len(errors) >= 1
-        assert any("circular" in e.lower() for e in errors)
+        jobs = get_jobs(config)
+        expected = check_all(config, jobs, frozenset(jobs), frozenset(config))
+        expected += check_circular_extends(config)
+        assert lint_all(config) == expected
+        assert len(expected) == 3
 
-    def test_three_node_cycle(self):
-        """Three-node cycle (A -> B -> C -> A) should produce error."""
-        config = {
-            ".a": {"extends": ".b"},
-            ".b": {"extends": ".c"},
-            ".c": {"extends": ".a"},
-        }
-        errors = check_circular_extends(config)
-        assert len(errors) >= 1
-        assert any("circular" in e.lower() for e in errors)
+    def test_default_stages(self):
+        """Without a 'stages' key, only the default stages are defined."""
+        config = {"build": {"stage": "build"}, "lint": {"stage": "lint"}}
+        assert lint_all(config) == ["Job 'lint' assignment to stage 'lint' which is not defined."]
 
-    def test_diamond_no_cycle(self):
-        """Diamond pattern (A -> B, A -> C, B -> D, C -> D) has no cycle."""
+    def test_exact_messages(self):
+        """Error texts are part of the output format and must stay stable."""
         config = {
-            ".d": {"script": "d"},
-            ".b": {"extends": ".d"},
-            ".c": {"extends": ".d"},
-            "a": {"extends": ".b"},  # Would need list extends for true diamond
+            "stages": ["build"],
+            "build": {"stage": "deploy", "needs": ["nope"], "extends": ".gone"},
         }
-        errors = check_circular_extends(config)
-        assert errors == []
+        assert lint_all(config) == [
+            "Job 'build' needs 'nope', which does not exist in this file.",
+            "Job 'build' assignment to stage 'deploy' which is not defined.",
+            "Job 'build' extends '.gone', which does not exist.",
+        ]